@@ -8,6 +8,8 @@ const { spawn } = require('child_process');
 const NLP_SCRIPT_PATH = path.join(__dirname, '../scripts/process_experience_nlp.py');
 const EXPERIENCES_FILE = path.join(__dirname, '../../public/processed_experiences.json');
 const TEMP_DIR = path.join(__dirname, '../data');
+const SEARCH_SERVICE_URL = process.env.SEARCH_SERVICE_URL || 'http://127.0.0.1:5001';
+const SEARCH_SERVICE_TIMEOUT_MS = 2000;
 
 // Ensure temp directory exists
 async function ensureTempDirectory() {
@@ -55,7 +57,7 @@ async function saveExperiences(experiences) {
 }
 
 // Process experience using NLP pipeline
-async function processExperienceWithNLP(experienceData) {
+async function processExperienceWithNLP(experienceData, { skipNearDuplicateCheck = false } = {}) {
   await ensureTempDirectory();
   
   return new Promise(async (resolve, reject) => {
@@ -84,7 +86,11 @@ async function processExperienceWithNLP(experienceData) {
       
       // Run NLP processing script
       console.log('Spawning Python process...');
-      const pythonProcess = spawn('python', [NLP_SCRIPT_PATH, tempInputFile, tempOutputFile], {
+      const args = [NLP_SCRIPT_PATH, tempInputFile, tempOutputFile];
+      if (skipNearDuplicateCheck) {
+        args.push('--no-near-duplicate-check');
+      }
+      const pythonProcess = spawn('python', args, {
         stdio: ['pipe', 'pipe', 'pipe'],
         env: { ...process.env, PYTHONUNBUFFERED: '1' }
       });
@@ -164,6 +170,21 @@ async function processExperienceWithNLP(experienceData) {
   });
 }
 
+// Call the Python semantic search service (scripts/semantic_search.py serve)
+async function callSearchService(pathname, options = {}) {
+  const controller = new AbortController();
+  const timeout = setTimeout(() => controller.abort(), SEARCH_SERVICE_TIMEOUT_MS);
+  try {
+    const response = await fetch(`${SEARCH_SERVICE_URL}${pathname}`, { ...options, signal: controller.signal });
+    if (!response.ok) {
+      throw new Error(`Search service responded with ${response.status}`);
+    }
+    return await response.json();
+  } finally {
+    clearTimeout(timeout);
+  }
+}
+
 // Create fallback processed experience
 function createFallbackExperience(experienceData, error) {
   console.log('Creating fallback experience due to NLP failure:', error.message);
@@ -275,6 +296,13 @@ router.post('/submit-experience', async (req, res) => {
     // Save updated experiences
     await saveExperiences(experiences);
     
+    // Index the new experience for semantic search (best effort)
+    callSearchService('/add', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ experiences: [processedExperience] })
+    }).catch(error => console.log('Search index update skipped:', error.message));
+    
     console.log('Experience saved successfully:', processedExperience.id);
     
     res.status(200).json({
@@ -307,26 +335,6 @@ router.get('/experiences', async (req, res) => {
   }
 });
 
-// Get experience by ID
-router.get('/experiences/:id', async (req, res) => {
-  try {
-    const experiences = await loadExperiences();
-    const experience = experiences.find(exp => exp.id === req.params.id);
-    
-    if (!experience) {
-      return res.status(404).json({ message: 'Experience not found' });
-    }
-    
-    res.json(experience);
-  } catch (error) {
-    console.error('Error loading experience:', error);
-    res.status(500).json({ 
-      message: 'Failed to load experience',
-      error: error.message 
-    });
-  }
-});
-
 // Get experiences with filters
 router.get('/experiences/filter', async (req, res) => {
   try {
@@ -414,13 +422,50 @@ router.get('/experiences/stats', async (req, res) => {
 // Search experiences
 router.get('/experiences/search', async (req, res) => {
   try {
-    const { q } = req.query;
+    const { q, company, difficulty } = req.query;
     
     if (!q || q.trim().length < 2) {
       return res.status(400).json({ message: 'Search query must be at least 2 characters' });
     }
     
-    const experiences = await loadExperiences();
+    const hasCompany = company && company !== 'all';
+    const hasDifficulty = difficulty && difficulty !== 'all';
+    
+    // Same rules as /experiences/filter and the search service: company by
+    // case-insensitive substring, difficulty exactly
+    let experiences = await loadExperiences();
+    if (hasCompany) {
+      experiences = experiences.filter(exp =>
+        (exp.company || '').toLowerCase().includes(company.trim().toLowerCase())
+      );
+    }
+    if (hasDifficulty) {
+      experiences = experiences.filter(exp =>
+        (exp.difficulty || '').trim().toLowerCase() === difficulty.trim().toLowerCase()
+      );
+    }
+    
+    // Semantic search first; fall back to substring matching if the service is down
+    // or has no hits (e.g. an experience whose index update failed)
+    try {
+      // Only user submissions; GfG rows are keyed by title and never match an id
+      const params = new URLSearchParams({ q: q.trim(), k: '50', kind: 'experience', source: 'user', min_score: '0.3' });
+      if (hasCompany) params.set('company', company);
+      if (hasDifficulty) params.set('difficulty', difficulty);
+      const { results } = await callSearchService(`/search?${params}`);
+      const byId = new Map(experiences.map(exp => [exp.id, exp]));
+      
+      // Earlier versions are marked stale by the service; dedupe by ref anyway
+      const refs = [...new Set(results.map(hit => hit.ref))];
+      const matches = refs.map(ref => byId.get(ref)).filter(Boolean);
+      if (matches.length > 0) {
+        return res.json(matches);
+      }
+      console.log('No semantic matches, using substring search');
+    } catch (error) {
+      console.log('Semantic search unavailable, using substring search:', error.message);
+    }
+    
     const searchTerm = q.toLowerCase().trim();
     
     const filteredExperiences = experiences.filter(exp => {
@@ -448,6 +493,26 @@ router.get('/experiences/search', async (req, res) => {
   }
 });
 
+// Get experience by ID
+router.get('/experiences/:id', async (req, res) => {
+  try {
+    const experiences = await loadExperiences();
+    const experience = experiences.find(exp => exp.id === req.params.id);
+    
+    if (!experience) {
+      return res.status(404).json({ message: 'Experience not found' });
+    }
+    
+    res.json(experience);
+  } catch (error) {
+    console.error('Error loading experience:', error);
+    res.status(500).json({ 
+      message: 'Failed to load experience',
+      error: error.message 
+    });
+  }
+});
+
 // Test NLP processing endpoint
 router.post('/test-nlp', async (req, res) => {
   try {
@@ -461,7 +526,9 @@ router.post('/test-nlp', async (req, res) => {
     };
     
     console.log('Testing NLP processing...');
-    const processed = await processExperienceWithNLP(testExperience);
+    // Test text must not be flagged as a near-duplicate of earlier test runs
+    // or end up in the production index
+    const processed = await processExperienceWithNLP(testExperience, { skipNearDuplicateCheck: true });
     
     res.json({
       message: 'NLP processing test successful',
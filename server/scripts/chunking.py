@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Bounded-Memory Chunking for Long Experience Texts
+Splits documents into bounded windows at paragraph/sentence boundaries and
+enforces a per-document time and memory ceiling while they are processed
+"""
+
+import json
+import os
+import re
+import sys
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+CHUNKING_CONFIG_PATH = os.path.join(DATA_DIR, 'chunking_config.json')
+
+# spaCy's default max_length is 1,000,000 characters; 5,000 keeps a chunk
+# well inside it and covers a typical GfG article (about 3,000 characters)
+# in one window, so short texts see no behaviour change.
+DEFAULT_LIMITS = {
+    'max_chunk_chars': 5000,         # upper bound for a single window
+    'max_document_seconds': 30.0,    # stop processing further chunks after this
+    'max_document_memory_mb': 512    # stop if RSS grows by more than this while processing
+}
+
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def load_limits(path=CHUNKING_CONFIG_PATH):
+    """Default limits overridden by an optional JSON config file"""
+    limits = dict(DEFAULT_LIMITS)
+    if path and os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                overrides = json.load(f)
+            limits.update({k: v for k, v in overrides.items() if k in DEFAULT_LIMITS})
+        except Exception as e:
+            logger.warning(f"Failed to load chunking config {path}: {e}")
+    return limits
+
+
+def _iter_sentences(segment):
+    position = 0
+    for match in _SENTENCE_END_RE.finditer(segment):
+        yield segment[position:match.start()]
+        position = match.end()
+    yield segment[position:]
+
+
+def _split_long(segment, max_chars):
+    """Yield pieces of a long segment split at sentence ends, then whitespace"""
+    current = ""
+    for sentence in _iter_sentences(segment):
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            if current:
+                yield current
+                current = ""
+            yield sentence[:cut]
+            sentence = sentence[cut:].lstrip()
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            yield current
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        yield current
+
+
+def iter_chunks(text, max_chars=DEFAULT_LIMITS['max_chunk_chars']):
+    """
+    Yield windows of at most max_chars characters, packing whole paragraphs
+    where possible and falling back to sentence and then word boundaries.
+    Paragraphs are found by scanning, so only one window is built at a time.
+    """
+    current = ""
+    position = 0
+    while position < len(text):
+        match = _PARAGRAPH_RE.search(text, position)
+        end = match.start() if match else len(text)
+        paragraph = text[position:end].strip()
+        position = match.end() if match else len(text)
+        if not paragraph:
+            continue
+
+        if len(paragraph) > max_chars:
+            if current:
+                yield current
+                current = ""
+            yield from _split_long(paragraph, max_chars)
+        elif current and len(current) + 2 + len(paragraph) > max_chars:
+            yield current
+            current = paragraph
+        else:
+            current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        yield current
+
+
+def current_rss_mb():
+    """Resident set size of this process in MB, or None if unavailable"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+    if RESOURCE_AVAILABLE:
+        # Peak rather than current RSS (bytes on macOS, KB elsewhere)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    return None
+
+
+class DocumentBudget:
+    """Time and memory ceiling for processing a single document"""
+
+    def __init__(self, limits=None):
+        limits = limits or DEFAULT_LIMITS
+        self.max_seconds = limits['max_document_seconds']
+        self.max_memory_mb = limits['max_document_memory_mb']
+        self.start_time = time.perf_counter()
+        self.start_rss = current_rss_mb()
+        self.exceeded = None
+
+    def elapsed(self):
+        return time.perf_counter() - self.start_time
+
+    def check(self):
+        """Return True while the document is within budget"""
+        if self.exceeded:
+            return False
+        if self.max_seconds and self.elapsed() > self.max_seconds:
+            self.exceeded = 'time_limit'
+        elif self.max_memory_mb and self.start_rss is not None:
+            rss = current_rss_mb()
+            if rss is not None and rss - self.start_rss > self.max_memory_mb:
+                self.exceeded = 'memory_limit'
+        if self.exceeded:
+            logger.warning(f"Document budget exceeded ({self.exceeded}) after {self.elapsed():.1f}s")
+        return not self.exceeded
+
+
+def iter_chunks_within_budget(text, limits=None, stats=None):
+    """
+    Yield chunks until the text is exhausted or the budget runs out.
+    Fills stats (if given) with chunk counts and the truncation reason.
+    """
+    limits = limits or DEFAULT_LIMITS
+    budget = DocumentBudget(limits)
+    stats = stats if stats is not None else {}
+    stats.update({'chunks_processed': 0, 'truncated': False, 'reason': None})
+
+    for chunk in iter_chunks(text, limits['max_chunk_chars']):
+        if not budget.check():
+            stats.update({'truncated': True, 'reason': budget.exceeded})
+            break
+        yield chunk
+        stats['chunks_processed'] += 1
+    stats['seconds'] = round(budget.elapsed(), 3)
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Near-Duplicate Detection for Interview Experiences
+MinHash signatures over word shingles with a persisted LSH index
+"""
+
+import json
+import os
+import re
+import zlib
+import time
+import logging
+
+from file_lock import file_lock
+
+logger = logging.getLogger(__name__)
+
+# Signature layout: NUM_PERM = BANDS * ROWS. With 16 bands of 8 rows the
+# LSH candidate curve crosses 50% at a Jaccard similarity of about 0.7.
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+DEFAULT_THRESHOLD = 0.8
+# Below this many shingles a signature is built from a handful of hashes and
+# generic one-liners ("it was great") would match each other at 1.0
+MIN_SHINGLES = 10
+
+_BIN_BITS = NUM_PERM.bit_length() - 1
+_BIN_MASK = NUM_PERM - 1
+_EMPTY = -1
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """Return the set of lowercased word shingles for text"""
+    tokens = _TOKEN_RE.findall(text.lower())
+    if len(tokens) < size:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def minhash_signature(text):
+    """
+    Compute a MinHash signature using one-permutation hashing.
+
+    Each shingle is hashed once; the low bits pick a bin and the remaining
+    bits are the value, so the cost is linear in the number of shingles
+    rather than shingles * permutations. Empty bins are filled from the
+    next non-empty bin (rotation densification) so short texts still get
+    comparable signatures. Texts with fewer than MIN_SHINGLES shingles get an
+    empty signature, which is never indexed or matched.
+    """
+    signature = [_EMPTY] * NUM_PERM
+    text_shingles = shingles(text)
+    if len(text_shingles) < MIN_SHINGLES:
+        return signature
+    for shingle in text_shingles:
+        h = zlib.crc32(shingle.encode("utf-8"))
+        b = h & _BIN_MASK
+        v = h >> _BIN_BITS
+        if signature[b] == _EMPTY or v < signature[b]:
+            signature[b] = v
+
+    if all(v == _EMPTY for v in signature):
+        return signature
+
+    offset = 1 << (32 - _BIN_BITS)
+    filled = list(signature)
+    for b in range(NUM_PERM):
+        if signature[b] != _EMPTY:
+            continue
+        distance = 1
+        while signature[(b + distance) % NUM_PERM] == _EMPTY:
+            distance += 1
+        filled[b] = signature[(b + distance) % NUM_PERM] + offset * distance
+    return filled
+
+
+def _unique_key(key, taken):
+    if key not in taken:
+        return key
+    n = 2
+    while f"{key}#{n}" in taken:
+        n += 1
+    return f"{key}#{n}"
+
+
+def estimate_jaccard(sig_a, sig_b):
+    """Estimate Jaccard similarity from two signatures"""
+    if not sig_a or not sig_b:
+        return 0.0
+    matches = sum(1 for a, b in zip(sig_a, sig_b) if a == b and a != _EMPTY)
+    return matches / NUM_PERM
+
+
+class NearDuplicateIndex:
+    """LSH index over MinHash signatures, persisted as JSON between runs"""
+
+    def __init__(self, path=None, threshold=DEFAULT_THRESHOLD):
+        self.path = path
+        self.threshold = threshold
+        self.signatures = {}
+        self.buckets = [dict() for _ in range(BANDS)]
+        self.pending = {}  # added since the last load/save, merged into the file on save
+        # Full-processing time across runs; single-record runs estimate savings from it
+        self.processing = {'count': 0, 'seconds': 0.0}
+        self.pending_processing = {'count': 0, 'seconds': 0.0}
+
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def _band_keys(self, signature):
+        for band in range(BANDS):
+            start = band * ROWS
+            yield band, hash(tuple(signature[start:start + ROWS]))
+
+    def __contains__(self, key):
+        return key in self.signatures
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def unique_key(self, key):
+        """Return key, or key#n if key is already taken"""
+        return _unique_key(key, self.signatures)
+
+    def _insert(self, key, signature):
+        self.signatures[key] = signature
+        for band, band_key in self._band_keys(signature):
+            self.buckets[band].setdefault(band_key, []).append(key)
+
+    def add(self, key, signature):
+        """Insert a signature under key"""
+        if key in self.signatures or signature[0] == _EMPTY:
+            return
+        self._insert(key, signature)
+        self.pending[key] = signature
+
+    def record_processing(self, seconds):
+        """Add one full-processing time to the persisted running average"""
+        for stats in (self.processing, self.pending_processing):
+            stats['count'] += 1
+            stats['seconds'] += seconds
+
+    def avg_processing_seconds(self):
+        count = self.processing['count']
+        return self.processing['seconds'] / count if count else 0.0
+
+    def query(self, signature, exclude=None):
+        """Return (key, similarity) of the closest indexed record at or above threshold"""
+        if signature[0] == _EMPTY:
+            return None
+        candidates = set()
+        for band, band_key in self._band_keys(signature):
+            candidates.update(self.buckets[band].get(band_key, ()))
+        candidates.discard(exclude)
+
+        best = None
+        for key in candidates:
+            similarity = estimate_jaccard(signature, self.signatures[key])
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (key, similarity)
+        return best
+
+    def _register(self, key, signature):
+        # The record already stored under key is not stored twice
+        if self.signatures.get(key) != signature:
+            self.add(self.unique_key(key), signature)
+
+    def register(self, key, text):
+        """Store text under key, or under key#n if key holds a different record"""
+        self._register(key, minhash_signature(text))
+
+    def check(self, key, text, register=True):
+        """
+        Look up text against the index and, if register is set, store it when
+        it is new. Returns a dict describing the duplicate, or None. Callers
+        that only want records that were processed successfully pass
+        register=False and call register() afterwards.
+
+        Re-checking the record already stored under key (same key, same
+        signature) does not match it against itself. Any other record whose
+        key is taken is matched normally and stored under a unique key.
+        """
+        signature = minhash_signature(text)
+        recheck = self.signatures.get(key) == signature
+        match = self.query(signature, exclude=key if recheck else None)
+        if match:
+            return {'duplicate_of': match[0], 'similarity': round(match[1], 3)}
+        if register:
+            self._register(key, signature)
+        return None
+
+    def _read_file(self, path):
+        """Return (signatures, processing stats) stored at path"""
+        empty = ({}, {'count': 0, 'seconds': 0.0})
+        if not os.path.exists(path):
+            return empty
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.warning(f"Failed to load near-duplicate index {path}: {e}")
+            return empty
+
+        if data.get('num_perm') != NUM_PERM or data.get('bands') != BANDS:
+            logger.warning("Near-duplicate index parameters changed, rebuilding")
+            return empty
+        processing = data.get('processing') or empty[1]
+        return data.get('signatures', {}), {'count': processing['count'], 'seconds': processing['seconds']}
+
+    def load(self, path):
+        with file_lock(path):
+            signatures, processing = self._read_file(path)
+        for key, signature in signatures.items():
+            if key not in self.signatures:
+                self._insert(key, signature)
+        self.processing = {
+            'count': processing['count'] + self.pending_processing['count'],
+            'seconds': processing['seconds'] + self.pending_processing['seconds']
+        }
+        logger.info(f"Loaded near-duplicate index with {len(self)} records")
+
+    def save(self, path=None):
+        """
+        Merge records added since the last save into the file; no-op if
+        nothing changed. The file is re-read under a lock so records saved
+        by other processes in the meantime are kept.
+        """
+        path = path or self.path
+        if not path or not (self.pending or self.pending_processing['count']):
+            return
+        with file_lock(path):
+            merged, processing = self._read_file(path)
+            for key, signature in self.pending.items():
+                if merged.get(key, signature) != signature:
+                    key = _unique_key(key, merged)
+                merged[key] = signature
+            processing['count'] += self.pending_processing['count']
+            processing['seconds'] += self.pending_processing['seconds']
+
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    'num_perm': NUM_PERM,
+                    'bands': BANDS,
+                    'shingle_size': SHINGLE_SIZE,
+                    'processing': processing,
+                    'signatures': merged
+                }, f)
+            os.replace(tmp_path, path)
+        self.pending = {}
+        self.pending_processing = {'count': 0, 'seconds': 0.0}
+        self.processing = processing
+
+        # Mirror the file, including records other processes saved meanwhile
+        self.signatures = {}
+        self.buckets = [dict() for _ in range(BANDS)]
+        for key, signature in merged.items():
+            self._insert(key, signature)
+
+
+class ComputeSavingsTracker:
+    """
+    Track time spent on full processing to estimate what skipping saved.
+    With an index, processing times are added to its persisted running
+    average, so a run that only sees near-duplicates still has an estimate.
+    """
+
+    def __init__(self, index=None):
+        self.index = index
+        self.checked = 0
+        self.processed = 0
+        self.processing_seconds = 0.0
+        self.skipped = 0
+        self.check_seconds = 0.0
+
+    def record_processed(self, seconds):
+        self.processed += 1
+        self.processing_seconds += seconds
+        if self.index is not None:
+            self.index.record_processing(seconds)
+
+    def record_check(self, seconds, skipped):
+        self.checked += 1
+        self.check_seconds += seconds
+        if skipped:
+            self.skipped += 1
+
+    def timed_check(self, index, key, text, register=True):
+        start = time.perf_counter()
+        duplicate = index.check(key, text, register=register)
+        self.record_check(time.perf_counter() - start, duplicate is not None)
+        return duplicate
+
+    def avg_processing_seconds(self):
+        if self.index is not None:
+            return self.index.avg_processing_seconds()
+        return self.processing_seconds / self.processed if self.processed else 0.0
+
+    def report(self):
+        avg_processing = self.avg_processing_seconds()
+        return {
+            'checked': self.checked,
+            'processed': self.processed,
+            'near_duplicates_skipped': self.skipped,
+            'avg_check_ms': round(1000 * self.check_seconds / self.checked, 3) if self.checked else 0.0,
+            'avg_processing_ms': round(1000 * avg_processing, 1),
+            'estimated_seconds_saved': round(avg_processing * self.skipped, 2)
+        }
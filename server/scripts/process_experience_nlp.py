@@ -8,6 +8,7 @@ import json
 import re
 import sys
 import os
+import time
 from datetime import datetime
 import logging
 
@@ -38,10 +39,20 @@ except ImportError as e:
 
 from collections import Counter
 
+from near_duplicate import NearDuplicateIndex, ComputeSavingsTracker
+from triage import triage_text, load_thresholds, ROUTE_FULL, ROUTE_SKIP
+from chunking import iter_chunks_within_budget, load_limits
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+NEAR_DUP_INDEX_PATH = os.path.join(DATA_DIR, 'experience_near_duplicate_index.json')
+
 class InterviewExperienceProcessor:
-    def __init__(self):
+    def __init__(self, triage_thresholds=None, chunk_limits=None):
         self.nltk_ready = False
         self.spacy_ready = False
+        self.triage_thresholds = triage_thresholds or load_thresholds()
+        self.chunk_limits = chunk_limits or load_limits()
         
         # Initialize NLTK components
         if NLTK_AVAILABLE:
@@ -114,12 +125,12 @@ class InterviewExperienceProcessor:
         self.sia = SentimentIntensityAnalyzer()
         self.stop_words = set(stopwords.words('english'))
 
-    def extract_questions(self, text):
+    def extract_questions(self, text, use_models=True):
         """Extract questions from text using simple pattern matching"""
         questions = []
         
         # Split into sentences using simple splitting if NLTK not available
-        if self.nltk_ready:
+        if self.nltk_ready and use_models:
             try:
                 sentences = sent_tokenize(text)
             except Exception as e:
@@ -170,12 +181,13 @@ class InterviewExperienceProcessor:
         
         return categorized
 
-    def analyze_sentiment(self, text):
+    def analyze_sentiment(self, text, use_models=True):
         """Perform sentiment analysis with fallback"""
         text_lower = text.lower()
+        use_vader = self.nltk_ready and use_models
         
         # Try VADER sentiment analysis if available
-        if self.nltk_ready:
+        if use_vader:
             try:
                 vader_scores = self.sia.polarity_scores(text)
             except Exception as e:
@@ -191,10 +203,14 @@ class InterviewExperienceProcessor:
             for keyword in keywords:
                 keyword_scores[sentiment] += text_lower.count(keyword)
         
+        return self.summarize_sentiment(vader_scores, keyword_scores, use_vader)
+
+    def summarize_sentiment(self, vader_scores, keyword_scores, use_vader):
+        """Derive the overall sentiment and confidence from VADER and keyword scores"""
         # Determine overall sentiment
-        if self.nltk_ready and vader_scores['compound'] >= 0.05:
+        if use_vader and vader_scores['compound'] >= 0.05:
             sentiment = 'positive'
-        elif self.nltk_ready and vader_scores['compound'] <= -0.05:
+        elif use_vader and vader_scores['compound'] <= -0.05:
             sentiment = 'negative'
         elif keyword_scores['positive'] > keyword_scores['negative']:
             sentiment = 'positive'
@@ -204,7 +220,7 @@ class InterviewExperienceProcessor:
             sentiment = 'neutral'
         
         # Calculate confidence
-        if self.nltk_ready:
+        if use_vader:
             confidence = abs(vader_scores['compound'])
         else:
             total_keywords = sum(keyword_scores.values())
@@ -220,7 +236,23 @@ class InterviewExperienceProcessor:
             'confidence': confidence
         }
 
-    def extract_key_insights(self, text):
+    def merge_sentiment(self, chunk_results, use_models=True):
+        """Combine per-chunk sentiment: VADER scores weighted by chunk length, keyword counts summed"""
+        if len(chunk_results) == 1:
+            return chunk_results[0][1]
+        
+        total_weight = sum(weight for weight, _ in chunk_results) or 1
+        vader_scores = {
+            key: sum(weight * result['vader_scores'][key] for weight, result in chunk_results) / total_weight
+            for key in ('compound', 'pos', 'neu', 'neg')
+        }
+        keyword_scores = {
+            key: sum(result['keyword_scores'][key] for _, result in chunk_results)
+            for key in ('positive', 'negative', 'neutral')
+        }
+        return self.summarize_sentiment(vader_scores, keyword_scores, self.nltk_ready and use_models)
+
+    def extract_key_insights(self, text, use_models=True):
         """Extract key insights from the experience"""
         insights = {
             'topics': [],
@@ -275,7 +307,7 @@ class InterviewExperienceProcessor:
                 insights['positive_aspects'].append(keyword)
         
         # Use spaCy for entity extraction if available
-        if self.spacy_ready and self.nlp:
+        if self.spacy_ready and self.nlp and use_models:
             try:
                 doc = self.nlp(text)
                 for ent in doc.ents:
@@ -293,6 +325,14 @@ class InterviewExperienceProcessor:
         
         return insights
 
+    def merge_insights(self, chunk_insights):
+        """Combine per-chunk insights, keeping first occurrences in document order"""
+        merged = {}
+        for insights in chunk_insights:
+            for key, values in insights.items():
+                merged.setdefault(key, []).extend(values)
+        return {key: list(dict.fromkeys(values)) for key, values in merged.items()}
+
     def extract_rounds(self, text):
         """Extract interview rounds information"""
         rounds = []
@@ -364,7 +404,73 @@ class InterviewExperienceProcessor:
         
         return highlights
 
-    def process_experience(self, experience_data):
+    def empty_analysis(self):
+        """Analysis fields for records that skip the NLP stages"""
+        return {
+            'sentiment_analysis': {
+                'sentiment': 'neutral',
+                'vader_scores': {'compound': 0.0, 'pos': 0.0, 'neu': 1.0, 'neg': 0.0},
+                'keyword_scores': {'positive': 0, 'negative': 0, 'neutral': 0},
+                'confidence': 0.5
+            },
+            'categorized_questions': self.categorize_questions([]),
+            'extracted_insights': {
+                'topics': [], 'skills': [], 'technologies': [], 'companies_mentioned': [],
+                'difficulty_indicators': [], 'preparation_tips': [], 'red_flags': [], 'positive_aspects': []
+            },
+            'interview_rounds': [],
+            'highlights': [],
+            'raw_questions': []
+        }
+
+    def build_record(self, experience_data, text_content, analysis, nlp_processed=True, use_models=True):
+        """Assemble the processed experience from analysis results"""
+        return {
+            'id': experience_data.get('id', f"exp_{datetime.now().strftime('%Y%m%d_%H%M%S')}"),
+            'title': experience_data.get('title', f"Interview at {experience_data.get('company', 'Unknown Company')}"),
+            'company': experience_data.get('company', ''),
+            'role': experience_data.get('role', ''),
+            'verdict': experience_data.get('verdict', ''),
+            'difficulty': experience_data.get('difficulty', ''),
+            'source': 'User Submission',
+            'timestamp': datetime.now().isoformat(),
+            
+            # NLP processed data
+            'nlp_processed': nlp_processed,
+            'nlp_tools_used': {
+                'nltk': self.nltk_ready and nlp_processed and use_models,
+                'spacy': self.spacy_ready and nlp_processed and use_models
+            },
+            'sentiment_analysis': analysis['sentiment_analysis'],
+            'categorized_questions': analysis['categorized_questions'],
+            'extracted_insights': analysis['extracted_insights'],
+            'interview_rounds': analysis['interview_rounds'],
+            'highlights': analysis['highlights'],
+            'feedback_sentiment': analysis['sentiment_analysis']['sentiment'],
+            'raw_questions': analysis['raw_questions'],
+            
+            # Original data preservation
+            'original_experience': text_content,
+            'user_data': {
+                'name': experience_data.get('name', ''),
+                'email': experience_data.get('email', ''),
+                'tags': experience_data.get('tags', ''),
+                'interviewType': experience_data.get('interviewType', ''),
+                'experienceLevel': experience_data.get('experienceLevel', ''),
+                'preparationTime': experience_data.get('preparationTime', ''),
+                'location': experience_data.get('location', ''),
+                'salary': experience_data.get('salary', ''),
+                'overallExperience': experience_data.get('overallExperience', ''),
+                'tips': experience_data.get('tips', ''),
+                'feedback': experience_data.get('feedback', ''),
+                'technicalQuestions': experience_data.get('technicalQuestions', []),
+                'behavioralQuestions': experience_data.get('behavioralQuestions', []),
+                'systemDesignQuestions': experience_data.get('systemDesignQuestions', []),
+                'codingQuestions': experience_data.get('codingQuestions', [])
+            }
+        }
+
+    def process_experience(self, experience_data, near_duplicate=None):
         """Main processing function"""
         try:
             logger.info(f"Processing experience: {experience_data.get('id', 'unknown')}")
@@ -375,74 +481,72 @@ class InterviewExperienceProcessor:
                 logger.warning("No experience text found")
                 return None
             
+            # Near-duplicates are flagged and skip the NLP stages
+            if near_duplicate:
+                logger.info(f"Near-duplicate of {near_duplicate['duplicate_of']}, skipping NLP stages")
+                analysis = self.empty_analysis()
+                analysis['highlights'] = ["Near-duplicate of an existing experience"]
+                processed_experience = self.build_record(experience_data, text_content, analysis, nlp_processed=False)
+                processed_experience['near_duplicate'] = near_duplicate
+                return processed_experience
+            
+            # Cheap triage decides which stages are worth running
+            triage = triage_text(text_content, self.triage_thresholds)
+            logger.info(f"Triage route: {triage['route']} ({triage['reason']})")
+            if triage['route'] == ROUTE_SKIP:
+                analysis = self.empty_analysis()
+                analysis['highlights'] = ["Experience text too short or unreadable for analysis"]
+                processed_experience = self.build_record(experience_data, text_content, analysis, nlp_processed=False)
+                processed_experience['triage'] = triage
+                return processed_experience
+            
+            # Lightweight texts only get the regex and keyword stages
+            use_models = triage['route'] == ROUTE_FULL
+            
             logger.info(f"Processing text of length: {len(text_content)}")
             
-            # Extract questions
-            questions = self.extract_questions(text_content)
+            # Stream bounded windows through each stage and merge the results
+            questions = []
+            sentiment_parts = []
+            insight_parts = []
+            rounds = []
+            chunking = {}
+            for chunk in iter_chunks_within_budget(text_content, self.chunk_limits, chunking):
+                questions.extend(self.extract_questions(chunk, use_models=use_models))
+                sentiment_parts.append((len(chunk), self.analyze_sentiment(chunk, use_models=use_models)))
+                insight_parts.append(self.extract_key_insights(chunk, use_models=use_models))
+                rounds.extend(self.extract_rounds(chunk))
+            if not sentiment_parts:
+                sentiment_parts.append((0, self.empty_analysis()['sentiment_analysis']))
+            logger.info(f"Processed {chunking['chunks_processed']} chunks in {chunking['seconds']}s")
             logger.info(f"Extracted {len(questions)} questions")
             
             # Categorize questions
             categorized_questions = self.categorize_questions(questions)
             
-            # Analyze sentiment
-            sentiment_analysis = self.analyze_sentiment(text_content)
+            # Merge sentiment
+            sentiment_analysis = self.merge_sentiment(sentiment_parts, use_models=use_models)
             logger.info(f"Sentiment analysis: {sentiment_analysis['sentiment']}")
             
-            # Extract insights
-            insights = self.extract_key_insights(text_content)
+            # Merge insights
+            insights = self.merge_insights(insight_parts) if insight_parts else self.empty_analysis()['extracted_insights']
             
-            # Extract rounds
-            rounds = self.extract_rounds(text_content)
             logger.info(f"Extracted {len(rounds)} interview rounds")
             
             # Generate highlights
             highlights = self.generate_highlights(insights, sentiment_analysis)
             
             # Create processed experience
-            processed_experience = {
-                'id': experience_data.get('id', f"exp_{datetime.now().strftime('%Y%m%d_%H%M%S')}"),
-                'title': experience_data.get('title', f"Interview at {experience_data.get('company', 'Unknown Company')}"),
-                'company': experience_data.get('company', ''),
-                'role': experience_data.get('role', ''),
-                'verdict': experience_data.get('verdict', ''),
-                'difficulty': experience_data.get('difficulty', ''),
-                'source': 'User Submission',
-                'timestamp': datetime.now().isoformat(),
-                
-                # NLP processed data
-                'nlp_processed': True,
-                'nlp_tools_used': {
-                    'nltk': self.nltk_ready,
-                    'spacy': self.spacy_ready
-                },
+            processed_experience = self.build_record(experience_data, text_content, {
                 'sentiment_analysis': sentiment_analysis,
                 'categorized_questions': categorized_questions,
                 'extracted_insights': insights,
                 'interview_rounds': rounds,
                 'highlights': highlights,
-                'feedback_sentiment': sentiment_analysis['sentiment'],
-                'raw_questions': questions,
-                
-                # Original data preservation
-                'original_experience': text_content,
-                'user_data': {
-                    'name': experience_data.get('name', ''),
-                    'email': experience_data.get('email', ''),
-                    'tags': experience_data.get('tags', ''),
-                    'interviewType': experience_data.get('interviewType', ''),
-                    'experienceLevel': experience_data.get('experienceLevel', ''),
-                    'preparationTime': experience_data.get('preparationTime', ''),
-                    'location': experience_data.get('location', ''),
-                    'salary': experience_data.get('salary', ''),
-                    'overallExperience': experience_data.get('overallExperience', ''),
-                    'tips': experience_data.get('tips', ''),
-                    'feedback': experience_data.get('feedback', ''),
-                    'technicalQuestions': experience_data.get('technicalQuestions', []),
-                    'behavioralQuestions': experience_data.get('behavioralQuestions', []),
-                    'systemDesignQuestions': experience_data.get('systemDesignQuestions', []),
-                    'codingQuestions': experience_data.get('codingQuestions', [])
-                }
-            }
+                'raw_questions': questions
+            }, use_models=use_models)
+            processed_experience['triage'] = triage
+            processed_experience['chunking'] = chunking
             
             logger.info("Experience processed successfully")
             return processed_experience
@@ -451,11 +555,14 @@ class InterviewExperienceProcessor:
             logger.error(f"Error processing experience: {str(e)}")
             return None
 
-def process_experience_file(input_file, output_file):
+def process_experience_file(input_file, output_file, index_file=NEAR_DUP_INDEX_PATH):
     """Process experiences from a JSON file"""
     logger.info(f"Processing file: {input_file} -> {output_file}")
     
     processor = InterviewExperienceProcessor()
+    # index_file=None skips the near-duplicate check (test runs)
+    index = NearDuplicateIndex(index_file) if index_file else None
+    savings = ComputeSavingsTracker(index)
     
     try:
         # Check if input file exists
@@ -472,9 +579,30 @@ def process_experience_file(input_file, output_file):
         
         for i, experience in enumerate(experiences):
             logger.info(f"Processing experience {i+1}/{len(experiences)}")
-            processed = processor.process_experience(experience)
+            
+            near_duplicate = None
+            text_content = experience.get('experience', '')
+            key = experience.get('id') or "exp"
+            if index is not None and text_content:
+                # Registered below, once the record has actually been produced
+                near_duplicate = savings.timed_check(index, key, text_content, register=False)
+                if near_duplicate:
+                    # Express runs one record per call, so this comes from the
+                    # running average stored with the index
+                    near_duplicate['estimated_seconds_saved'] = round(savings.avg_processing_seconds(), 2)
+            
+            start = time.perf_counter()
+            processed = processor.process_experience(experience, near_duplicate=near_duplicate)
             if processed:
                 processed_experiences.append(processed)
+                if not near_duplicate:
+                    savings.record_processed(time.perf_counter() - start)
+                    if index is not None:
+                        index.register(key, text_content)
+        
+        if index is not None:
+            index.save()
+            logger.info(f"Near-duplicate check: {savings.report()}")
         
         # Ensure output directory exists
         os.makedirs(os.path.dirname(output_file), exist_ok=True)
@@ -491,11 +619,12 @@ def process_experience_file(input_file, output_file):
         print(f"Error: {str(e)}")
 
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: python process_experience_nlp.py input_file.json output_file.json")
+    args = [arg for arg in sys.argv[1:] if arg != '--no-near-duplicate-check']
+    if len(args) != 2:
+        print("Usage: python process_experience_nlp.py input_file.json output_file.json [--no-near-duplicate-check]")
         sys.exit(1)
     
-    input_file = sys.argv[1]
-    output_file = sys.argv[2]
+    input_file, output_file = args
+    index_file = NEAR_DUP_INDEX_PATH if len(args) == len(sys.argv) - 1 else None
     
-    process_experience_file(input_file, output_file)
\ No newline at end of file
+    process_experience_file(input_file, output_file, index_file=index_file)
\ No newline at end of file
@@ -3,21 +3,30 @@ os.environ["TRANSFORMERS_NO_TF"] = "1"
 
 import json
 import re
+import time
 import spacy
 from collections import defaultdict
 
 from transformers import pipeline
 from sentence_transformers import SentenceTransformer, util
 
+from near_duplicate import NearDuplicateIndex, ComputeSavingsTracker
+from triage import triage_text, load_thresholds, ROUTE_FULL, ROUTE_SKIP
+from semantic_search import SemanticSearchIndex, documents_from_gfg, add_via_service
+from chunking import iter_chunks_within_budget, load_limits
+
 # Load models once
 nlp = spacy.load("en_core_web_sm")
 sbert_model = SentenceTransformer("all-MiniLM-L6-v2")
 sentiment_pipeline = pipeline("sentiment-analysis")
+triage_thresholds = load_thresholds()
+chunk_limits = load_limits()
 
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 DATA_DIR = os.path.join(BASE_DIR, 'data')
 RAW_DATA_PATH = os.path.join(DATA_DIR, 'raw_data.json')
 ENHANCED_DATA_PATH = os.path.join(DATA_DIR, 'enhanced_gfg_data.json')
+NEAR_DUP_INDEX_PATH = os.path.join(DATA_DIR, 'near_duplicate_index.json')
 
 
 # Normalize round names
@@ -71,7 +80,7 @@ def deduplicate_questions_semantically(questions, threshold=0.8):
     return deduped
 
 
-def extract_questions_by_round(content):
+def extract_questions_by_round(content, use_models=True):
     rounds = defaultdict(list)
     current_round = "General"
 
@@ -98,19 +107,24 @@ def extract_questions_by_round(content):
     # Deduplicate + add topics
     final = {}
     for round_name, qs in rounds.items():
-        deduped = deduplicate_questions_semantically(qs)
+        deduped = deduplicate_questions_semantically(qs) if use_models else list(dict.fromkeys(qs))
         final[round_name] = [{"question": q} for q in deduped]
 
 
     return final
 
-def extract_highlights(text, max_sentences=8):
-    doc = nlp(text)
+def extract_highlights(text, max_sentences=8, use_models=True):
+    if use_models:
+        # Parse one bounded window at a time so the budget is checked before each parse
+        chunks = iter_chunks_within_budget(text, chunk_limits)
+        sentences = (sent.text for chunk in chunks for sent in nlp(chunk).sents)
+    else:
+        sentences = re.split(r"(?<=[.!?])\s+|\n+", text)
     highlights = []
     seen = set()
 
-    for sent in doc.sents:
-        sent_text = sent.text.strip()
+    for sent_text in sentences:
+        sent_text = sent_text.strip()
 
         # Skip too short or uninformative lines
         if len(sent_text) < 40 or len(sent_text.split()) < 5:
@@ -166,10 +180,17 @@ def extract_metadata(entry):
     difficulty = {"easy": "Easy", "medium": "Medium", "moderate": "Medium", "hard": "Hard", "difficult": "Hard", "tough": "Hard"}.get(diff_match.group(1)) if diff_match else ""
 
     verdict = extract_verdict(content)
-    questions_by_round = extract_questions_by_round(content)
+
+    # Junk is skipped entirely, short texts avoid the SBERT/spaCy/transformer models
+    triage = triage_text(content, triage_thresholds)
+    if triage["route"] == ROUTE_SKIP:
+        questions_by_round, highlights, sentiment = {}, [], ""
+    else:
+        use_models = triage["route"] == ROUTE_FULL
+        questions_by_round = extract_questions_by_round(content, use_models=use_models)
+        highlights = extract_highlights(content, use_models=use_models)
+        sentiment = analyze_sentiment(content) if use_models else ""
     total_questions = sum(len(v) for v in   questions_by_round.values())
-    highlights = extract_highlights(content)
-    sentiment = analyze_sentiment(content)
 
     return {
         "company": company,
@@ -180,9 +201,15 @@ def extract_metadata(entry):
         "question_count": total_questions,
         "questions_by_round": questions_by_round,
         "highlights": highlights,
-        "feedback_sentiment": sentiment
+        "feedback_sentiment": sentiment,
+        "triage": triage
     }
-def process_enhanced_pipeline(input_file=RAW_DATA_PATH, output_file=ENHANCED_DATA_PATH):
+def _entry_text(entry):
+    return entry.get("content") or entry.get("experience") or ""
+
+
+def process_enhanced_pipeline(input_file=RAW_DATA_PATH, output_file=ENHANCED_DATA_PATH,
+                              index_file=NEAR_DUP_INDEX_PATH):
     # Load raw data (new experiences)
     with open(input_file, "r", encoding="utf-8") as f:
         raw_data = json.load(f)
@@ -194,13 +221,35 @@ def process_enhanced_pipeline(input_file=RAW_DATA_PATH, output_file=ENHANCED_DAT
     else:
         existing_enhanced = []
 
+    # Near-duplicate index, seeded with anything already enhanced
+    index = NearDuplicateIndex(index_file)
+    for entry in existing_enhanced:
+        key = entry.get("title") or entry.get("url")
+        if key not in index:
+            index.check(key or "entry", _entry_text(entry))
+
     # Filter new entries (not already in enhanced)
     already_titles = {entry['title'] for entry in existing_enhanced if 'title' in entry}
     new_enriched = []
+    near_duplicates = []
+    savings = ComputeSavingsTracker(index)
 
     for entry in raw_data:
-        if entry.get("title") not in already_titles:
-            new_enriched.append({**entry, **extract_metadata(entry)})
+        if entry.get("title") in already_titles:
+            continue
+
+        # Reposts with tweaked titles / resubmissions skip the model stack.
+        # Every entry gets its own key so same-titled entries in one batch match each other
+        key = index.unique_key(entry.get("title") or entry.get("url") or "entry")
+        duplicate = savings.timed_check(index, key, _entry_text(entry), register=False)
+        if duplicate:
+            near_duplicates.append({"key": key, **duplicate})
+            continue
+
+        start = time.perf_counter()
+        new_enriched.append({**entry, **extract_metadata(entry)})
+        savings.record_processed(time.perf_counter() - start)
+        index.register(key, _entry_text(entry))
 
     # Merge and write back
     merged = existing_enhanced + new_enriched
@@ -208,7 +257,28 @@ def process_enhanced_pipeline(input_file=RAW_DATA_PATH, output_file=ENHANCED_DAT
     with open(output_file, "w", encoding="utf-8") as f:
         json.dump(merged, f, indent=2, ensure_ascii=False)
 
+    index.save()
+
+    # Keep the semantic search index current. Go through the running service so
+    # it sees the new rows; write directly (reusing the loaded SBERT model) only
+    # when it is down.
+    try:
+        try:
+            added = add_via_service({"gfg": new_enriched})
+        except OSError:
+            added = SemanticSearchIndex(encoder=sbert_model).add(documents_from_gfg(new_enriched))
+        print(f"[✓] Added {added} documents to the search index")
+    except Exception as e:
+        print(f"[!] Search index update failed: {e}")
+
     print(f"[✓] Appended {len(new_enriched)} entries to '{output_file}'")
+    for dup in near_duplicates:
+        print(f"[~] Skipped near-duplicate '{dup['key']}' of '{dup['duplicate_of']}' (similarity {dup['similarity']})")
+    report = savings.report()
+    print(f"[i] Near-duplicate check: {report['checked']} checked, "
+          f"{report['near_duplicates_skipped']} skipped, {report['avg_check_ms']} ms/record, "
+          f"~{report['estimated_seconds_saved']}s of NLP processing saved")
+    return report
 
 
 
@@ -216,8 +286,12 @@ def summarize_text_spacy(text, max_sentences=3):
     """
     Generate a simple summary of the input text using spaCy sentence splitting.
     """
-    doc = nlp(text)
-    sentences = [sent.text.strip() for sent in doc.sents if len(sent.text.strip()) > 40]
+    sentences = []
+    for chunk in iter_chunks_within_budget(text, chunk_limits):
+        doc = nlp(chunk)
+        sentences.extend(sent.text.strip() for sent in doc.sents if len(sent.text.strip()) > 40)
+        if len(sentences) >= max_sentences:
+            break
     return " ".join(sentences[:max_sentences])
 
 
@@ -0,0 +1,487 @@
+#!/usr/bin/env python3
+"""
+Semantic Search over Interview Experiences and GfG Questions
+Normalised all-MiniLM-L6-v2 embeddings in a memory-mapped float32 matrix,
+queried with a single matrix product and served over local HTTP
+"""
+
+import json
+import os
+import sys
+import time
+import zlib
+import argparse
+import logging
+import threading
+import urllib.request
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import numpy as np
+
+from file_lock import file_lock
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+PROJECT_DIR = os.path.abspath(os.path.join(BASE_DIR, '..'))
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+SEARCH_INDEX_DIR = os.path.join(DATA_DIR, 'search_index')
+
+# Same sources the Express routes and the GfG pipeline read and write
+EXPERIENCES_PATH = os.path.join(PROJECT_DIR, 'public', 'processed_experiences.json')
+ENHANCED_DATA_PATH = os.path.join(DATA_DIR, 'enhanced_gfg_data.json')
+QUESTIONS_PATH = os.path.join(PROJECT_DIR, 'public', 'java_questions.json')
+
+MODEL_NAME = "all-MiniLM-L6-v2"
+EMBEDDING_DIM = 384
+DEFAULT_PORT = 5001
+SEARCH_SERVICE_URL = os.environ.get("SEARCH_SERVICE_URL", f"http://127.0.0.1:{DEFAULT_PORT}")
+FILTER_FIELDS = ('kind', 'source', 'company', 'difficulty')
+# Matched like /api/experiences/filter: company by substring, the rest exactly
+SUBSTRING_FILTER_FIELDS = ('company',)
+# Sources whose ref identifies one record, so a new version replaces the old rows
+VERSIONED_SOURCES = ('user', 'gfg')
+SNIPPET_LENGTH = 300
+
+
+def _document(kind, source, ref, text, record):
+    text = (text or "").strip()
+    return {
+        'id': f"{kind}:{ref}:{zlib.crc32(text.encode('utf-8')):08x}",
+        'kind': kind,
+        'source': source,  # 'user', 'gfg' or 'question_bank'; ref is an experience id only for 'user'
+        'ref': ref,
+        'company': (record.get('company') or '').strip(),
+        'difficulty': (record.get('difficulty') or '').strip(),
+        'text': text
+    }
+
+
+def documents_from_experiences(records):
+    """Documents for user-submitted experiences and their extracted questions"""
+    documents = []
+    for record in records:
+        ref = record.get('id')
+        text = record.get('original_experience') or record.get('experience')
+        if not ref or not text:
+            continue
+        documents.append(_document('experience', 'user', ref, text, record))
+        for question in record.get('raw_questions') or []:
+            documents.append(_document('question', 'user', ref, question, record))
+    return documents
+
+
+def documents_from_gfg(records):
+    """Documents for GfG experiences, their highlights and questions by round"""
+    documents = []
+    for record in records:
+        ref = record.get('title') or record.get('url')
+        text = record.get('content')
+        if not ref or not text:
+            continue
+        documents.append(_document('experience', 'gfg', ref, f"{record.get('title', '')}\n{text}", record))
+        for highlight in record.get('highlights') or []:
+            documents.append(_document('highlight', 'gfg', ref, highlight, record))
+        for questions in (record.get('questions_by_round') or {}).values():
+            for question in questions:
+                documents.append(_document('question', 'gfg', ref, question.get('question'), record))
+    return documents
+
+
+def documents_from_questions(records):
+    """Documents for the GfG question bank"""
+    return [
+        _document('question', 'question_bank', 'question_bank', record.get('question'), record)
+        for record in records if record.get('question')
+    ]
+
+
+class SemanticSearchIndex:
+    """
+    Embedding matrix stored as raw float32 rows (embeddings.f32) next to a
+    metadata list (meta.json). Rows are L2-normalised, so cosine similarity
+    is a dot product and a query is one matrix-vector product over the
+    memory-mapped matrix. New documents are appended without rewriting
+    existing rows.
+    """
+
+    def __init__(self, index_dir=SEARCH_INDEX_DIR, encoder=None):
+        self.index_dir = index_dir
+        self.embeddings_path = os.path.join(index_dir, 'embeddings.f32')
+        self.meta_path = os.path.join(index_dir, 'meta.json')
+        self._encoder = encoder
+        self._lock = threading.Lock()
+        self.meta = []
+        self.ids = set()
+        self.matrix = np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+        self.filters = {field: {} for field in FILTER_FIELDS}
+        self.stale_rows = frozenset()
+        self.load()
+
+    @property
+    def encoder(self):
+        if self._encoder is None:
+            os.environ.setdefault("TRANSFORMERS_NO_TF", "1")
+            from sentence_transformers import SentenceTransformer
+            self._encoder = SentenceTransformer(MODEL_NAME)
+        return self._encoder
+
+    def __len__(self):
+        return len(self.meta)
+
+    def encode(self, texts):
+        embeddings = self.encoder.encode(
+            texts, batch_size=64, convert_to_numpy=True, normalize_embeddings=True
+        )
+        return np.asarray(embeddings, dtype=np.float32).reshape(len(texts), EMBEDDING_DIM)
+
+    def _index_filters(self, start):
+        for row in range(start, len(self.meta)):
+            for field in FILTER_FIELDS:
+                value = self.meta[row][field].lower()
+                if value:
+                    self.filters[field].setdefault(value, []).append(row)
+
+    def _map_matrix(self, rows):
+        if rows == 0:
+            self.matrix = np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+        else:
+            self.matrix = np.memmap(self.embeddings_path, dtype=np.float32, mode='r',
+                                    shape=(rows, EMBEDDING_DIM))
+
+    def _read_meta(self):
+        """Metadata on disk, limited to rows the embeddings file actually holds"""
+        if not os.path.exists(self.meta_path) or not os.path.exists(self.embeddings_path):
+            return []
+        with open(self.meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta and any(field not in meta[0] for field in FILTER_FIELDS):
+            # Built before a filter field existed; the next add re-embeds everything
+            logger.warning("Search index metadata is missing filter fields, rebuilding")
+            return []
+
+        # Rows appended after the last metadata write are ignored
+        rows = min(len(meta), os.path.getsize(self.embeddings_path) // (4 * EMBEDDING_DIM))
+        return meta[:rows]
+
+    def _use_meta(self, meta):
+        self.meta = meta
+        self.ids = {doc['id'] for doc in meta}
+        self.filters = {field: {} for field in FILTER_FIELDS}
+        self._index_filters(0)
+        self.stale_rows = frozenset(row for row, doc in enumerate(meta) if doc.get('stale'))
+        self._map_matrix(len(meta))
+
+    def _mark_stale(self, documents):
+        """
+        Flag rows of a user or GfG record that are not among the documents
+        given for it now (an edited record's previous text, highlights and
+        questions). Returns True if any row changed.
+        """
+        current = {}
+        for doc in documents:
+            if doc['source'] in VERSIONED_SOURCES:
+                current.setdefault((doc['source'], doc['ref']), set()).add(doc['id'])
+        if not current:
+            return False
+
+        changed = False
+        for doc in self.meta:
+            ids = current.get((doc['source'], doc['ref']))
+            if ids is None or (doc['id'] not in ids) == bool(doc.get('stale')):
+                continue
+            if doc['id'] in ids:
+                del doc['stale']
+            else:
+                doc['stale'] = True
+            changed = True
+        return changed
+
+    def load(self):
+        self._use_meta(self._read_meta())
+        if self.meta:
+            logger.info(f"Loaded search index with {len(self.meta)} documents")
+
+    def add(self, documents):
+        """
+        Embed and append documents that are not indexed yet; returns the number added.
+        Rows of a record's earlier versions are marked stale and no longer
+        returned. The service and the GfG pipeline may both append, so the
+        index is re-read under a file lock before writing.
+        """
+        with self._lock:
+            new_docs, seen = [], set()
+            for doc in documents:
+                if doc['text'] and doc['id'] not in self.ids and doc['id'] not in seen:
+                    new_docs.append(doc)
+                    seen.add(doc['id'])
+            if new_docs:
+                embeddings = self.encode([doc['text'] for doc in new_docs])
+            os.makedirs(self.index_dir, exist_ok=True)
+
+            with file_lock(self.meta_path):
+                # Pick up rows other processes added or marked stale since this index was loaded
+                meta = self._read_meta()
+                if meta != self.meta:
+                    self._use_meta(meta)
+                keep = [i for i, doc in enumerate(new_docs) if doc['id'] not in self.ids]
+                new_docs = [new_docs[i] for i in keep]
+                start = len(self.meta)
+
+                if new_docs:
+                    embeddings = embeddings[keep]
+                    # Drop only rows that meta.json does not account for (an interrupted add)
+                    expected_size = len(self.meta) * 4 * EMBEDDING_DIM
+                    if os.path.exists(self.embeddings_path) and os.path.getsize(self.embeddings_path) != expected_size:
+                        self._map_matrix(0)
+                        with open(self.embeddings_path, "r+b") as f:
+                            f.truncate(expected_size)
+                    with open(self.embeddings_path, "ab") as f:
+                        f.write(embeddings.tobytes())
+
+                    for doc in new_docs:
+                        self.meta.append({**doc, 'text': doc['text'][:SNIPPET_LENGTH]})
+                        self.ids.add(doc['id'])
+
+                if not self._mark_stale(documents) and not new_docs:
+                    return 0
+                tmp_path = f"{self.meta_path}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(self.meta, f, ensure_ascii=False)
+                os.replace(tmp_path, self.meta_path)
+
+            self._index_filters(start)
+            self.stale_rows = frozenset(row for row, doc in enumerate(self.meta) if doc.get('stale'))
+            self._map_matrix(len(self.meta))
+            logger.info(f"Added {len(new_docs)} documents to search index")
+            return len(new_docs)
+
+    def _candidate_rows(self, limit, kind=None, source=None, company=None, difficulty=None):
+        rows = None
+        for field, value in (('kind', kind), ('source', source), ('company', company), ('difficulty', difficulty)):
+            if not value:
+                continue
+            value = value.strip().lower()
+            if field in SUBSTRING_FILTER_FIELDS:
+                matches = [row for key, key_rows in self.filters[field].items() if value in key for row in key_rows]
+            else:
+                matches = self.filters[field].get(value, [])
+            rows = set(matches) if rows is None else rows.intersection(matches)
+        if rows is None:
+            return None
+        # Rows appended by a concurrent add are not in this snapshot of the matrix
+        rows = rows - self.stale_rows
+        return np.fromiter(sorted(row for row in rows if row < limit), dtype=np.int64)
+
+    def search_batch(self, queries, k=10, kind=None, source=None, company=None, difficulty=None,
+                     min_score=None):
+        """Top-k hits for each query, scored with one (rows x dim) @ (dim x queries) product"""
+        if not queries:
+            return []
+        query_vectors = self.encode(queries)
+
+        matrix, meta, stale = self.matrix, self.meta, self.stale_rows
+        rows = self._candidate_rows(len(matrix), kind, source, company, difficulty)
+        if rows is not None:
+            matrix = matrix[rows]
+        if len(matrix) == 0:
+            return [[] for _ in queries]
+
+        scores = np.asarray(matrix @ query_vectors.T)
+        if rows is None and stale:
+            # Filtered rows already exclude stale ones; mask them instead of copying the matrix
+            scores[[row for row in stale if row < len(matrix)]] = -np.inf
+        k = min(k, len(matrix))
+        results = []
+        for column in range(len(queries)):
+            column_scores = scores[:, column]
+            top = np.argpartition(-column_scores, k - 1)[:k]
+            top = top[np.argsort(-column_scores[top])]
+            hits = []
+            for position in top:
+                if np.isneginf(column_scores[position]) or (
+                        min_score is not None and column_scores[position] < min_score):
+                    break
+                row = int(rows[position]) if rows is not None else int(position)
+                hits.append({**meta[row], 'score': round(float(column_scores[position]), 4)})
+            results.append(hits)
+        return results
+
+    def search(self, query, k=10, kind=None, source=None, company=None, difficulty=None, min_score=None):
+        return self.search_batch([query], k=k, kind=kind, source=source, company=company,
+                                 difficulty=difficulty, min_score=min_score)[0]
+
+
+def add_via_service(payload, url=SEARCH_SERVICE_URL, timeout=120):
+    """
+    POST records ({'experiences': [...], 'gfg': [...], 'questions': [...]})
+    to a running service's /add. Raises OSError if the service is unreachable.
+    """
+    request = urllib.request.Request(
+        f"{url}/add",
+        data=json.dumps(payload, ensure_ascii=False).encode("utf-8"),
+        headers={'Content-Type': 'application/json'}
+    )
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.load(response)['added']
+
+
+def _load_json(path):
+    if not os.path.exists(path):
+        logger.warning(f"Data file not found: {path}")
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def build_index(index):
+    """Index every experience, highlight and question in the data files"""
+    documents = (
+        documents_from_experiences(_load_json(EXPERIENCES_PATH)) +
+        documents_from_gfg(_load_json(ENHANCED_DATA_PATH)) +
+        documents_from_questions(_load_json(QUESTIONS_PATH))
+    )
+    added = index.add(documents)
+    print(f"[✓] Indexed {added} new documents ({len(index)} total)")
+    return added
+
+
+def benchmark(index, queries=None, runs=200, k=10, target_p99_ms=50.0):
+    """Measure end-to-end query latency (encode + matrix product + top-k)"""
+    if not queries:
+        queries = [doc['text'][:80] for doc in index.meta if doc['kind'] == 'question'][:50]
+    queries = queries or ["LRU cache design"]
+
+    index.search(queries[0], k=k)  # warm up the model
+    latencies = []
+    for i in range(runs):
+        start = time.perf_counter()
+        index.search(queries[i % len(queries)], k=k)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    report = {
+        'documents': len(index),
+        'runs': runs,
+        'p50_ms': round(float(p50), 2),
+        'p95_ms': round(float(p95), 2),
+        'p99_ms': round(float(p99), 2),
+        'target_p99_ms': target_p99_ms,
+        'passed': bool(p99 <= target_p99_ms)
+    }
+    print(json.dumps(report, indent=2))
+    return report
+
+
+class SearchRequestHandler(BaseHTTPRequestHandler):
+    index = None
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+
+        if url.path == "/health":
+            self._send_json(200, {'status': 'ok', 'documents': len(self.index)})
+        elif url.path == "/search":
+            query = params.get('q', '').strip()
+            if len(query) < 2:
+                self._send_json(400, {'message': 'Search query must be at least 2 characters'})
+                return
+            try:
+                k = max(1, min(int(params.get('k', 10)), 100))
+                min_score = float(params['min_score']) if 'min_score' in params else None
+            except ValueError:
+                self._send_json(400, {'message': 'Invalid k or min_score'})
+                return
+            start = time.perf_counter()
+            hits = self.index.search(query, k=k, kind=params.get('kind'), source=params.get('source'),
+                                     company=params.get('company'), difficulty=params.get('difficulty'),
+                                     min_score=min_score)
+            self._send_json(200, {
+                'query': query,
+                'took_ms': round((time.perf_counter() - start) * 1000, 2),
+                'results': hits
+            })
+        else:
+            self._send_json(404, {'message': 'Not found'})
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/add":
+            self._send_json(404, {'message': 'Not found'})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            documents = (
+                documents_from_experiences(payload.get('experiences', [])) +
+                documents_from_gfg(payload.get('gfg', [])) +
+                documents_from_questions(payload.get('questions', []))
+            )
+            added = self.index.add(documents)
+            self._send_json(200, {'added': added, 'documents': len(self.index)})
+        except Exception as e:
+            logger.error(f"Error adding documents: {e}")
+            self._send_json(400, {'message': 'Failed to add documents'})
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+def serve(index, port=DEFAULT_PORT):
+    SearchRequestHandler.index = index
+    index.encoder  # load the model before accepting requests
+    server = ThreadingHTTPServer(("127.0.0.1", port), SearchRequestHandler)
+    logger.info(f"Semantic search service on http://127.0.0.1:{port} ({len(index)} documents)")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Semantic search over experiences and questions")
+    parser.add_argument("--index-dir", default=SEARCH_INDEX_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("build", help="index all data files (only new documents are embedded)")
+
+    serve_parser = commands.add_parser("serve", help="run the HTTP search service")
+    serve_parser.add_argument("--port", type=int, default=int(os.environ.get("SEARCH_SERVICE_PORT", DEFAULT_PORT)))
+    serve_parser.add_argument("--no-build", action="store_true", help="skip indexing data files on startup")
+
+    query_parser = commands.add_parser("query", help="run a single query")
+    query_parser.add_argument("query")
+    query_parser.add_argument("-k", type=int, default=10)
+    query_parser.add_argument("--kind")
+    query_parser.add_argument("--source", choices=("user", "gfg", "question_bank"))
+    query_parser.add_argument("--company")
+    query_parser.add_argument("--difficulty")
+
+    bench_parser = commands.add_parser("bench", help="measure query latency percentiles")
+    bench_parser.add_argument("--runs", type=int, default=200)
+    bench_parser.add_argument("-k", type=int, default=10)
+    bench_parser.add_argument("--target-p99-ms", type=float, default=50.0)
+
+    args = parser.parse_args()
+    search_index = SemanticSearchIndex(args.index_dir)
+
+    if args.command == "build":
+        build_index(search_index)
+    elif args.command == "serve":
+        if not args.no_build:
+            build_index(search_index)
+        serve(search_index, args.port)
+    elif args.command == "query":
+        for hit in search_index.search(args.query, k=args.k, kind=args.kind, source=args.source,
+                                       company=args.company, difficulty=args.difficulty):
+            print(f"{hit['score']:.3f}  [{hit['kind']}] {hit['company'] or '-'}  {hit['text'][:100]!r}")
+    elif args.command == "bench":
+        report = benchmark(search_index, runs=args.runs, k=args.k, target_p99_ms=args.target_p99_ms)
+        sys.exit(0 if report['passed'] else 1)
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Triage Gate for Interview Experience Texts
+Cheap pre-classification that routes each text to a full, lightweight or skip path
+"""
+
+import json
+import math
+import os
+import re
+import sys
+import logging
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+TRIAGE_CONFIG_PATH = os.path.join(DATA_DIR, 'triage_config.json')
+
+ROUTE_FULL = 'full'
+ROUTE_LIGHTWEIGHT = 'lightweight'
+ROUTE_SKIP = 'skip'
+
+# Calibrated against server/data (raw_data.json, processed_experiences.json,
+# enhanced_gfg_data.json, processed_gfg_data.json):
+#   - keyboard mashes ("hfkjshhj", "pdpewqjs", "fdmgkjfgdgnjdsl") have a
+#     dictionary ratio of 0 and a vowel ratio <= 0.13
+#   - "aaaaaaaaaaa" has 0 bits of entropy; real texts are >= 3.0 bits
+#   - genuine short submissions ("it was great", "it was a good experience")
+#     are 3-8 words; the shortest full write-up is 99 words and GfG articles
+#     are 170+ words
+#   - jargon-heavy write-ups ("Round 1 OA on HackerRank: 2 DSA problems ...
+#     Round 4 HLD: URL shortener, Kafka, Redis, sharding", "Asked DSA, OOPs,
+#     DBMS, OS, CN questions") have a dictionary ratio of 0.2-0.3 but a vowel
+#     ratio of 0.33-0.35, so a low dictionary ratio alone only skips texts of
+#     one or two words ("heyy")
+DEFAULT_THRESHOLDS = {
+    'min_letters': 3,                # fewer letters than this is skipped
+    'entropy_min_length': 8,         # only apply the entropy check from this length
+    'min_entropy': 1.0,              # bits per character
+    'min_dictionary_ratio': 0.3,     # share of tokens that are known words
+    'max_unknown_skip_words': 2,     # below the ratio, texts up to this many words are skipped
+    'min_vowel_ratio': 0.2,          # share of latin letters that are vowels
+    'max_vowel_ratio': 0.7,
+    'min_latin_ratio': 0.5,          # share of letters in the latin alphabet
+    'full_min_words': 50,            # fewer words than this gets the lightweight path
+    'sample_tokens': 2000,           # tokens inspected for the dictionary ratio
+    'sample_chars': 20000            # characters inspected for every other feature
+}
+
+# Common English words plus interview vocabulary. Kept small on purpose: the
+# ratio only has to separate language from noise, not spell-check.
+DICTIONARY_WORDS = set("""
+a about above after again against all also am an and any are as at be because been before being
+below between both but by can could did do does doing done down during each even ever every few
+for from further get got had has have having he her here hers him his how i if in into is it its
+just know last like lot lots made make many me more most much my myself never new next no nor not
+now of off on once one only or other our out over own really same she should so some still such
+than that the their them then there these they this those through time to too two under until up
+us very was we well went were what when where which while who whom why will with would yes you
+your first second third final asked ask asking told said felt feel think thought great good
+bad nice okay ok fine amazing awesome excellent poor terrible easy hard tough difficult medium
+moderate simple smooth friendly helpful rude overall experience experiences interview interviews
+interviewer interviewers interviewed round rounds question questions answer answers technical hr
+coding code problem problems solve solved solution design system project projects resume company
+role job offer offered selected rejected shortlisted cleared process online assessment test
+aptitude managerial manager team work worked working startup intern internship fresher campus
+placement candidate position engineer developer software data structure structures algorithm
+algorithms java python sql database array string tree graph learned learn learning prepare
+preparation practice tips advice recently applied received email call phone video onsite virtual
+discussion group behavioral culture salary location hired hiring recruiter recruitment result
+""".split())
+
+_TOKEN_RE = re.compile(r"[^\W\d_]+", re.UNICODE)
+_VOWELS = set("aeiou")
+
+
+def load_thresholds(path=TRIAGE_CONFIG_PATH):
+    """Default thresholds overridden by an optional JSON config file"""
+    thresholds = dict(DEFAULT_THRESHOLDS)
+    if path and os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                overrides = json.load(f)
+            unknown = set(overrides) - set(DEFAULT_THRESHOLDS)
+            if unknown:
+                logger.warning(f"Ignoring unknown triage thresholds: {sorted(unknown)}")
+            thresholds.update({k: v for k, v in overrides.items() if k in DEFAULT_THRESHOLDS})
+        except Exception as e:
+            logger.warning(f"Failed to load triage config {path}: {e}")
+    return thresholds
+
+
+def char_entropy(text):
+    """Shannon entropy of the character distribution in bits"""
+    if not text:
+        return 0.0
+    total = len(text)
+    return 0.0 - sum((n / total) * math.log2(n / total) for n in Counter(text).values())
+
+
+def text_features(text, sample_tokens=DEFAULT_THRESHOLDS['sample_tokens'],
+                  sample_chars=DEFAULT_THRESHOLDS['sample_chars']):
+    """
+    Compute the cheap features used for routing. Only the first sample_chars
+    characters are inspected, so 'words' and 'letters' are capped for very
+    long texts (which are well past every threshold anyway).
+    """
+    stripped = text.strip()
+    head = stripped[:sample_chars]
+    tokens = _TOKEN_RE.findall(head.lower())
+    letters = [c for c in head.lower() if c.isalpha()]
+    latin = [c for c in letters if 'a' <= c <= 'z']
+    sample = tokens[:sample_tokens]
+
+    return {
+        'length': len(stripped),
+        'words': len(tokens),
+        'letters': len(letters),
+        'entropy': round(char_entropy(head), 3),
+        'dictionary_ratio': round(sum(1 for t in sample if t in DICTIONARY_WORDS) / len(sample), 3) if sample else 0.0,
+        'vowel_ratio': round(sum(1 for c in latin if c in _VOWELS) / len(latin), 3) if latin else 0.0,
+        'latin_ratio': round(len(latin) / len(letters), 3) if letters else 0.0
+    }
+
+
+def triage_text(text, thresholds=None):
+    """
+    Route text to 'full', 'lightweight' or 'skip'.
+    Returns a dict with the route, the reason and the features used.
+    """
+    thresholds = thresholds or DEFAULT_THRESHOLDS
+    features = text_features(text or '', thresholds['sample_tokens'], thresholds['sample_chars'])
+
+    if features['letters'] < thresholds['min_letters']:
+        route, reason = ROUTE_SKIP, 'too_short'
+    elif features['length'] >= thresholds['entropy_min_length'] and features['entropy'] < thresholds['min_entropy']:
+        route, reason = ROUTE_SKIP, 'low_entropy'
+    elif features['latin_ratio'] < thresholds['min_latin_ratio']:
+        route, reason = ROUTE_SKIP, 'non_english'
+    elif features['dictionary_ratio'] < thresholds['min_dictionary_ratio']:
+        # Jargon and abbreviations are rarely dictionary words but still read
+        # like language, so only unpronounceable or one-word texts are dropped
+        if not thresholds['min_vowel_ratio'] <= features['vowel_ratio'] <= thresholds['max_vowel_ratio']:
+            route, reason = ROUTE_SKIP, 'gibberish'
+        elif features['words'] <= thresholds['max_unknown_skip_words']:
+            route, reason = ROUTE_SKIP, 'low_dictionary_ratio'
+        else:
+            route, reason = ROUTE_LIGHTWEIGHT, 'low_dictionary_ratio'
+    elif features['words'] < thresholds['full_min_words']:
+        route, reason = ROUTE_LIGHTWEIGHT, 'short_text'
+    else:
+        route, reason = ROUTE_FULL, 'ok'
+
+    return {'route': route, 'reason': reason, 'features': features}
+
+
+def calibrate(paths, thresholds=None):
+    """Print features and routes for every text in the given data files"""
+    thresholds = thresholds or load_thresholds()
+    routes = Counter()
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            records = json.load(f)
+        print(f"{path} ({len(records)} records)")
+        for record in records:
+            text = record.get('experience') or record.get('content') or record.get('original_experience') or ''
+            result = triage_text(text, thresholds)
+            routes[result['route']] += 1
+            f_ = result['features']
+            print(f"  {result['route']:<11} {result['reason']:<20} words={f_['words']:<5} "
+                  f"entropy={f_['entropy']:<5} dict={f_['dictionary_ratio']:<5} "
+                  f"vowel={f_['vowel_ratio']:<5} {text[:40]!r}")
+    print(f"Routes: {dict(routes)}")
+    return routes
+
+
+if __name__ == "__main__":
+    files = sys.argv[1:] or [
+        os.path.join(DATA_DIR, name)
+        for name in ('raw_data.json', 'processed_experiences.json', 'enhanced_gfg_data.json')
+    ]
+    calibrate(files)